@@ -9,6 +9,7 @@ from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+import asyncio
 import os
 import tempfile
 from pathlib import Path
@@ -23,6 +24,7 @@ load_dotenv(dotenv_path=env_path, override=True)
 
 from backend.extractors.contract_extractor_multiplo import ContractExtractorMultiplo
 from backend.processors.document_processor import DocumentProcessor
+from backend.processors.ocr_provider import warmup_ocr_provider
 
 # Importa módulo de banco de dados usando SQLAlchemy
 from backend.database.database import init_db, get_db, get_session
@@ -51,15 +53,24 @@ app = FastAPI(
     },
 )
 
+# Referência à tarefa de warmup do OCR (o event loop só guarda referência fraca às tarefas)
+_tarefa_warmup_ocr = None
+
+
 # Inicializa banco de dados na startup
 @app.on_event("startup")
 async def startup_event():
-    """Inicializa o banco de dados na inicialização da API."""
+    """Inicializa o banco de dados e o provedor de OCR na inicialização da API."""
     try:
         init_db()
         print("[OK] Banco de dados inicializado com sucesso")
     except Exception as e:
         print(f"[WARN] Erro ao inicializar banco de dados: {e}")
+    
+    # Carrega os modelos de OCR em segundo plano (em thread, sem travar o event loop), não
+    # na primeira requisição com imagem; a API já aceita requisições enquanto isso
+    global _tarefa_warmup_ocr
+    _tarefa_warmup_ocr = asyncio.create_task(asyncio.to_thread(warmup_ocr_provider))
 
 
 # Configura CORS para permitir requisições do Next.js
@@ -281,8 +292,10 @@ async def extract_contract(file: UploadFile = File(...)):
         doc_processor = get_doc_processor()
         
         # Processa o documento (PDF ou imagem)
-        texto_extraido = doc_processor.process_document(file_path=temp_path)
-        resultado = extractor.extract_from_text(texto_extraido)
+        texto_extraido = await doc_processor.aprocess_document(file_path=temp_path)
+        # Versão assíncrona: a espera pelo limitador de TPM e o backoff em 429 usam
+        # asyncio.sleep, sem travar o event loop (health checks, outros uploads)
+        resultado = await extractor.aextract_from_text(texto_extraido)
         
         # Salva automaticamente no banco de dados (só se não for duplicado)
         analise_salva = None
@@ -47,7 +47,7 @@ has_any_ia = has_ollama or has_groq or has_openai
 demo_mode = not has_any_ia
 
 if demo_mode:
-    from backend.extractors.simple_extractor import SimpleContractExtractor
+    from backend.extractors.simple_extractor import EXTRACTOR as SIMPLE_EXTRACTOR
     st.error("⚠️ **ATENÇÃO: Modo Demo com Limitações Sérias**")
     st.warning("🚨 **Quota do Gemini excedida ou sem IA configurada**")
     st.markdown("""
@@ -221,7 +221,7 @@ if uploaded_file is not None:
             
             # Inicializa o extrator (demo ou com IA)
             if demo_mode:
-                extractor = SimpleContractExtractor()
+                extractor = SIMPLE_EXTRACTOR
                 with st.spinner("📄 Processando contrato (modo demo - pode estar incorreto)..."):
                     if is_image:
                         # Para imagens, extrai texto com OCR primeiro
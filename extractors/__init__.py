@@ -2,9 +2,9 @@
 Módulos de extração de informações de contratos.
 """
 from .contract_extractor_multiplo import ContractExtractorMultiplo
-from .simple_extractor import SimpleContractExtractor
+from .simple_extractor import SimpleContractExtractor, EXTRACTOR
 
-__all__ = ["ContractExtractorMultiplo", "SimpleContractExtractor"]
+__all__ = ["ContractExtractorMultiplo", "SimpleContractExtractor", "EXTRACTOR"]
 
 
 
@@ -0,0 +1,56 @@
+"""
+Cache em disco, endereçado por conteúdo, para resultados de extração via IA.
+
+Cada entrada é um arquivo JSON cujo nome é o SHA-256 de
+(provider, modelo, versão do prompt, texto processado).
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+# Diretório padrão (pode ser alterado por FLEX_EXTRACT_CACHE_DIR)
+_CACHE_DIR_PADRAO = Path.home() / ".cache" / "flex-analise"
+
+
+class ExtractionCache:
+    """Cache de extrações em arquivos JSON, um arquivo por chave."""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Inicializa o cache.
+
+        Args:
+            cache_dir: Diretório do cache (opcional, usa FLEX_EXTRACT_CACHE_DIR ou ~/.cache/flex-analise)
+        """
+        self.cache_dir = Path(cache_dir or os.getenv("FLEX_EXTRACT_CACHE_DIR") or _CACHE_DIR_PADRAO)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(provider: str, model: str, prompt_version: str, processed_text: str) -> str:
+        """Gera a chave do cache a partir das entradas que determinam a resposta do LLM."""
+        conteudo = f"{provider}|{model}|{prompt_version}|{processed_text}"
+        return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        """Retorna o resultado em cache, ou None se não existir (ou estiver corrompido)."""
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, value: dict) -> None:
+        """Grava o resultado no cache (escrita atômica; falhas não interrompem a extração)."""
+        destino = self._path(key)
+        temporario = destino.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(temporario, destino)
+        except OSError as e:
+            print(f"[WARN] Não foi possível gravar no cache de extração: {e}")
@@ -0,0 +1,56 @@
+"""
+Limitador de taxa (token bucket) para chamadas aos providers de IA.
+
+Segura as requisições no cliente até haver tokens disponíveis no período,
+em vez de deixar o provider responder 429 (ex: Groq, 6000 tokens/minuto).
+"""
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket com capacidade por período, usável em código síncrono e assíncrono."""
+
+    def __init__(self, capacidade: float, periodo: float = 60.0):
+        """
+        Inicializa o limitador.
+
+        Args:
+            capacidade: Tokens disponíveis por período (ex: 6000 TPM)
+            periodo: Duração do período em segundos
+        """
+        self.capacidade = capacidade
+        self.taxa = capacidade / periodo  # Tokens repostos por segundo
+        self._disponivel = capacidade
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reservar(self, quantidade: float) -> float:
+        """
+        Reserva a quantidade de tokens e retorna quantos segundos esperar antes de usá-los.
+
+        O saldo pode ficar negativo (reserva antecipada): cada chamador espera
+        proporcionalmente ao que falta, preservando a ordem de chegada.
+        """
+        quantidade = min(quantidade, self.capacidade)
+        with self._lock:
+            agora = time.monotonic()
+            self._disponivel = min(self.capacidade, self._disponivel + (agora - self._ultimo) * self.taxa)
+            self._ultimo = agora
+            self._disponivel -= quantidade
+            if self._disponivel >= 0:
+                return 0.0
+            return -self._disponivel / self.taxa
+
+    def acquire(self, quantidade: float = 1) -> None:
+        """Bloqueia até a quantidade de tokens estar disponível."""
+        espera = self._reservar(quantidade)
+        if espera > 0:
+            time.sleep(espera)
+
+    async def aacquire(self, quantidade: float = 1) -> None:
+        """Versão assíncrona de acquire (não bloqueia o event loop)."""
+        espera = self._reservar(quantidade)
+        if espera > 0:
+            await asyncio.sleep(espera)
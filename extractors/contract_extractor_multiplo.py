@@ -32,35 +32,325 @@ Para implementar recálculo de contratos com base em dados do BACEN, será neces
    - Validar cálculos do contrato vs. recálculo com taxas BACEN
    - Identificar divergências que possam indicar irregularidades
 """
+import asyncio
+import atexit
+import functools
+import json
 import os
-from typing import Optional
+import re
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+import httpx
 from dotenv import load_dotenv
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.output_parsers import JsonOutputParser, PydanticOutputParser
+from pydantic import ValidationError
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 from backend.processors.document_processor import DocumentProcessor
 from backend.models.models import ContratoInfo
 from backend.calculators.recalculo_bacen import RecalculoBacen
+from backend.extractors._extract_cache import ExtractionCache
+from backend.extractors._rate_limiter import TokenBucket
+
+# Carrega .env da pasta backend/config ou raiz (uma vez por processo)
+# Usa globals() porque importlib.reload reexecuta o módulo mantendo os globais existentes
+if not globals().get("_ENV_LOADED", False):
+    env_path = Path(__file__).parent.parent / "config" / ".env"
+    if not env_path.exists():
+        env_path = Path(__file__).parent.parent.parent / ".env"
+    load_dotenv(dotenv_path=env_path, override=True)
+    _ENV_LOADED = True
+
+# SDKs dos providers importados no carregamento do módulo (o import do LangChain leva
+# 100-500 ms e cairia na primeira requisição); pacote ausente só falha se o provider for usado
+try:
+    from langchain_groq import ChatGroq
+except ImportError:
+    ChatGroq = None
+
+try:
+    from langchain_ollama import ChatOllama
+except ImportError:
+    ChatOllama = None
+
+try:
+    from langchain_openai import ChatOpenAI
+except ImportError:
+    ChatOpenAI = None
+
+# Cliente do Ollama usado na detecção do provider: pré-carregado só com OLLAMA_ENABLED=1
+# (o import em _detectar_provider passa a vir de sys.modules)
+if os.getenv("OLLAMA_ENABLED") == "1":
+    try:
+        import ollama  # noqa: F401
+    except ImportError:
+        pass
+
+# Padrões usados em _limpar_observacoes (compilados uma vez no carregamento do módulo)
+_RE_R_SPACE = re.compile(r'\bR\s+(\d)')
+_RE_R_DIGIT = re.compile(r'\bR(\d)')
+_RE_MULTISPACE = re.compile(r'[ \t]+')
+_RE_LINE_STRIP = re.compile(r'^[ \t]+|[ \t]+$', re.MULTILINE)
+_RE_MULTINEWLINE = re.compile(r'\n\n\n+')
+
+# Orçamento de tokens para o texto do contrato
+_MAX_TOKENS_TEXTO = 3500
+_TOKENS_RESERVA_RESPOSTA = 1500  # JSON + observações (~500 palavras)
+_TPM_POR_PROVIDER = {"groq": 6000}  # Limite do Groq para llama-3.1-8b-instant
+
+# Frações do orçamento tentadas novamente após 413 (requisição maior que o TPM)
+_FRACOES_TAMANHO = (0.8, 0.6, 0.4)
+
+# Resposta fora do schema: reenvia o erro de validação ao modelo (texto completo preservado)
+_TENTATIVAS_FEEDBACK = 2
+_MSG_FEEDBACK = (
+    "Sua última resposta falhou na validação: {erro}. "
+    "Retorne um JSON corrigido, seguindo o schema."
+)
+
+# Papéis das mensagens do LangChain no formato da API da OpenAI (Batch API)
+_PAPEIS_OPENAI = {"system": "system", "human": "user", "ai": "assistant"}
+
+# Versão do prompt (entra na chave do cache de extração; altere ao mudar o prompt)
+_PROMPT_VERSION = "v3"
+
+
+# Cliente HTTP compartilhado pelas chamadas síncronas aos LLMs (pool de conexões + HTTP/2
+# quando o pacote h2 está instalado): evita um handshake TCP/TLS por requisição.
+# Não há um AsyncClient equivalente: as conexões de um AsyncClient ficam presas ao event
+# loop que as abriu, e o módulo roda em loops diferentes (o do FastAPI e um novo a cada
+# asyncio.run) - o async fica com o cliente do SDK
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+_HTTPX_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+_HTTPX_SYNC = httpx.Client(http2=_HTTP2, timeout=60, limits=_HTTPX_LIMITS)
+
+
+@atexit.register
+def _fechar_clientes_http() -> None:
+    """Fecha o cliente HTTP compartilhado ao encerrar o processo."""
+    _HTTPX_SYNC.close()
+
+
+def _deve_repetir(exc: BaseException) -> bool:
+    """Repete (com backoff) apenas rate limit transitório - não 413 nem limite diário."""
+    return ContractExtractorMultiplo._erro_rate_limit_transitorio(str(exc))
+
+
+def _log_nova_tentativa(retry_state) -> None:
+    print(f"[WARN] Rate limit do provider - nova tentativa {retry_state.attempt_number + 1} "
+          f"em {retry_state.next_action.sleep:.1f}s")
+
+
+# Backoff exponencial com jitter para 429 transitórios (1s até 30s, no máximo 5 tentativas)
+_retry_rate_limit = retry(
+    retry=retry_if_exception(_deve_repetir),
+    wait=wait_exponential_jitter(initial=1, max=30),
+    stop=stop_after_attempt(5),
+    before_sleep=_log_nova_tentativa,
+    reraise=True,
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _tokenizador():
+    """
+    Tokenizador para truncamento preciso, carregado no primeiro uso (opcional: sem
+    tiktoken, estima 1 token ≈ 4 chars).
+    
+    Não é carregado no import: com o cache frio o tiktoken baixa o vocabulário (requests
+    sem timeout), e o _setup_backend importa este módulo na inicialização da API.
+    """
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:  # tiktoken não instalado ou vocabulário indisponível (sem rede)
+        return None
+
+
+def _contar_tokens(texto: str) -> int:
+    """Conta tokens do texto (estimativa por caracteres se tiktoken não estiver disponível)."""
+    enc = _tokenizador()
+    if enc is None:
+        return len(texto) // 4
+    return len(enc.encode(texto))
+
+
+class _LogCachePrompt(BaseCallbackHandler):
+    """
+    Loga quantos tokens do prompt vieram do cache de prefixo da OpenAI.
+    
+    A OpenAI reaproveita automaticamente prefixos idênticos de 1024+ tokens (desconto no
+    custo e menor latência), por isso o system prompt é fixo e o contrato vem por último.
+    """
+    
+    def on_llm_end(self, response, **kwargs) -> None:
+        for geracoes in response.generations:
+            for geracao in geracoes:
+                uso = getattr(getattr(geracao, "message", None), "usage_metadata", None)
+                if not uso:
+                    continue
+                em_cache = (uso.get("input_token_details") or {}).get("cache_read", 0)
+                print(f"[DEBUG] DEBUG: Prompt caching OpenAI: {em_cache}/{uso.get('input_tokens', 0)} tokens do prompt em cache")
+
+
+# Template do prompt - CALIBRADO para máxima assertividade
+# Este prompt foi refinado para:
+# 1. Extração mais precisa de dados numéricos e datas
+# 2. Análise crítica mais assertiva de irregularidades
+# 3. Identificação mais confiável de bancos/instituições
+# 4. Melhor tratamento de diferentes formatos de contrato
+# A parte fixa (system + instruções de formato) precisa ficar byte a byte idêntica entre
+# chamadas e antes do texto do contrato, para aproveitar o cache de prefixo dos providers
+_SYSTEM_PROMPT = """Você é um especialista em análise de contratos financeiros brasileiros (CDC, normas BACEN, Tabela Price/SAC).
+Extraia os dados com MÁXIMA PRECISÃO. Layouts variam: procure sinônimos (ex: devedor/cliente).
+
+REGRAS:
+- Valores, taxas e datas EXATAMENTE como no contrato; datas AAAA-MM-DD; números com ponto decimal (ex: 1250.50).
+- Taxa de juros: a da operação (mensal). NÃO confunda com CET.
+- Banco credor (obrigatório): identifique por nome, logo ou CNPJ.
+
+OBSERVAÇÕES (2 parágrafos, máximo 500 palavras, valores em R$):
+P1: Resumo dos dados (valores, taxas, bem).
+P2: Análise de irregularidades (obrigatória): juros > 5% a.m., CET omitido, multas > 2%, falta de transparência.
+Termine com: "IRREGULARIDADES IDENTIFICADAS: [lista]" ou "NÃO FORAM IDENTIFICADAS IRREGULARIDADES EVIDENTES".
+
+{format_instructions}"""
+
+_HUMAN_PROMPT = """Contrato:
+{contract_text}"""
+
+_PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
+    ("system", _SYSTEM_PROMPT),
+    ("human", _HUMAN_PROMPT),
+])
+
+# Como o schema do ContratoInfo chega ao modelo, por provider:
+# - "nativo": structured output do provider (OpenAI, via function calling) - schema fora do prompt
+# - "json": modo JSON do provider (Groq) + lista compacta dos campos no prompt
+# - "schema": instruções completas do PydanticOutputParser no prompt (Ollama)
+_MODO_SAIDA_POR_PROVIDER = {"openai": "nativo", "groq": "json"}
+
+# Campos preenchidos pelo pós-processamento, não pela IA
+_CAMPOS_INTERNOS = {"recalculo_bacen"}
+
+_TIPOS_JSON = {"string": "texto", "number": "número", "integer": "inteiro", "object": "objeto"}
+
+# Templates já preparados (com format_instructions fixadas), por (modelo Pydantic, modo de saída)
+_PROMPTS_PREPARADOS: dict = {}
 
-from pathlib import Path
-import os
 
-# Carrega .env da pasta backend/config ou raiz
-env_path = Path(__file__).parent.parent / "config" / ".env"
-if not env_path.exists():
-    env_path = Path(__file__).parent.parent.parent / ".env"
-load_dotenv(dotenv_path=env_path, override=True)
+def _instrucoes_json_compactas(modelo) -> str:
+    """Dica curta de formato (nome e tipo de cada campo) para providers em modo JSON."""
+    campos = []
+    for nome, prop in modelo.model_json_schema()["properties"].items():
+        if nome in _CAMPOS_INTERNOS:
+            continue
+        tipos = [t.get("type") for t in prop.get("anyOf", [prop])]
+        tipo = "/".join(_TIPOS_JSON.get(t, t) for t in tipos if t and t != "null")
+        campos.append(f"{nome} ({tipo})")
+    return (
+        "Responda APENAS com um objeto JSON com as chaves: " + ", ".join(campos) + ". "
+        "Use null para dados ausentes; números sem R$, % ou separador de milhar."
+    )
+
+
+def _preparar_prompt(output_parser: PydanticOutputParser, modo: str = "schema") -> tuple:
+    """
+    Retorna (format_instructions, template parcial, tokens do prompt) para o parser e o modo de saída.
+    
+    Calculado uma vez por (modelo Pydantic, modo) e reaproveitado por todas as instâncias do extrator.
+    """
+    chave = (output_parser.pydantic_object, modo)
+    if chave not in _PROMPTS_PREPARADOS:
+        if modo == "nativo":
+            format_instructions = ""  # O schema vai na definição da função, não no texto
+        elif modo == "json":
+            format_instructions = _instrucoes_json_compactas(output_parser.pydantic_object)
+        else:
+            format_instructions = output_parser.get_format_instructions()
+        template = _PROMPT_TEMPLATE.partial(format_instructions=format_instructions)
+        prompt_tokens = _contar_tokens(template.format(contract_text=""))
+        _PROMPTS_PREPARADOS[chave] = (format_instructions, template, prompt_tokens)
+    return _PROMPTS_PREPARADOS[chave]
+
+
+@functools.lru_cache(maxsize=1)
+def _detectar_provider() -> str:
+    """
+    Detecta qual provider está disponível (resultado cacheado por processo).
+    
+    FLEX_LLM_PROVIDER no .env força o provider e pula a detecção ("auto" ou vazio detecta).
+    """
+    forcado = (os.getenv("FLEX_LLM_PROVIDER") or "").lower()
+    if forcado and forcado != "auto":
+        return forcado
+    
+    # Prioridade: Groq (com modelos Gemini) primeiro (gratuito e melhor para cálculos), 
+    # depois Ollama, depois OpenAI
+    
+    # Prioridade: Groq primeiro (gratuito, rápido, e suporta Gemini para cálculos precisos)
+    # Verifica Groq (gratuito, muito rápido, suporta modelos Gemini)
+    if os.getenv("GROQ_API_KEY") or os.getenv("GROQ_API_KEYS"):
+        return "groq"
+    
+    # Verifica Ollama (local, sempre disponível se instalado)
+    # Antes de chamar ollama.list() (que pode travar segundos), testa se a porta está aberta
+    if _porta_aberta("127.0.0.1", 11434):
+        try:
+            import ollama
+            # Testa se o servidor está rodando
+            ollama.list()
+            return "ollama"
+        except:
+            pass
+    
+    # Verifica OpenAI (mais caro, mas funciona bem)
+    if os.getenv("OPENAI_API_KEY"):
+        return "openai"
+    
+    raise ValueError(
+        "Nenhum provider de IA configurado. Configure pelo menos um:\n"
+        "- Groq (GRATUITO, suporta Gemini): GROQ_API_KEY no .env\n"
+        "- Ollama (GRÁTIS, local): Instale em https://ollama.ai\n"
+        "- OpenAI: OPENAI_API_KEY no .env"
+    )
+
+
+def _porta_aberta(host: str, porta: int, timeout: float = 0.2) -> bool:
+    """Verifica rapidamente se há um servidor escutando em host:porta."""
+    s = socket.socket()
+    s.settimeout(timeout)
+    try:
+        return s.connect_ex((host, porta)) == 0
+    except OSError:
+        return False
+    finally:
+        s.close()
 
 
 class ContractExtractorMultiplo:
     """Extrai informações de contratos usando diferentes IAs (OpenAI, Ollama, Groq, Gemini)."""
     
-    def __init__(self, provider: str = "auto", model_name: Optional[str] = None):
+    def __init__(self, provider: str = "auto", model_name: Optional[str] = None, use_cache: bool = False):
         """
         Inicializa o extrator.
         
         Args:
             provider: "openai", "ollama", "groq", "gemini", ou "auto" (detecta automaticamente)
             model_name: Nome do modelo (opcional, usa padrão por provider)
+            use_cache: Se True, reutiliza extrações anteriores do mesmo texto (cache em disco,
+                diretório configurável por FLEX_EXTRACT_CACHE_DIR)
         """
         self.provider = provider.lower()
         self.document_processor = DocumentProcessor()
@@ -69,90 +359,64 @@ class ContractExtractorMultiplo:
         
         # Se auto, detecta qual está disponível
         if self.provider == "auto":
-            self.provider = self._detectar_provider()
+            self.provider = _detectar_provider()
         
         # Inicializa o LLM baseado no provider
+        # (_llm_pool: uma instância por chave de API - hoje só o Groq aceita várias, via GROQ_API_KEYS)
+        self._llm_pool: List = []
         self.llm = self._inicializar_llm(model_name)
+        if not self._llm_pool:
+            self._llm_pool = [self.llm]
+        self.model_name = getattr(self.llm, "model_name", None) or getattr(self.llm, "model", None) or ""
         
-        # Template do prompt - CALIBRADO para máxima assertividade
-        # Este prompt foi refinado para:
-        # 1. Extração mais precisa de dados numéricos e datas
-        # 2. Análise crítica mais assertiva de irregularidades
-        # 3. Identificação mais confiável de bancos/instituições
-        # 4. Melhor tratamento de diferentes formatos de contrato
-        self.prompt_template = ChatPromptTemplate.from_messages([
-            ("system", """Você é um especialista em análise de contratos financeiros brasileiros (CDC, normas BACEN, Tabela Price/SAC).
-Extraia informações estruturadas com MÁXIMA PRECISÃO. 
-IMPORTANTE: Contratos têm layouts variados. Procure por sinônimos (ex: devedor/cliente).
-
-CRITÉRIOS:
-1. PRECISÃO NUMÉRICA: Valores, taxas e datas EXATAMENTE como aparecem.
-2. ANÁLISE CRÍTICA: Identifique abusividades (Taxas > 5% a.m., multas > 2%, CET omitido).
-3. BANCO: Identifique por nome, logo ou CNPJ.
-
-CAMPOS:
-- Nome Cliente, CPF/CNPJ.
-- Valor Dívida, Parcelas (qtd e valor), 1º Vencimento.
-- Taxa Juros Operação (mensal). NÃO confunda com CET.
-- Banco Credor (Obrigatório).
-- Dados Veículo (marca, modelo, ano, placa, renavam).
-
-OBSERVAÇÕES (2 Parágrafos):
-P1: Resumo dos dados (valores, taxas, bem).
-P2: Análise de Irregularidades (Obrigatório). Avalie juros, CET, multas (>2%) e transparência.
-Termine com: "IRREGULARIDADES IDENTIFICADAS: [lista]" ou "NÃO FORAM IDENTIFICADAS IRREGULARIDADES EVIDENTES".
-
-{format_instructions}"""),
-            ("human", """Analise o contrato abaixo e extraia os dados. 
-Máximo 500 palavras nas observações.
-
-Contrato:
-{contract_text}""")
-        ])
-
-    
-    def _detectar_provider(self) -> str:
-        """Detecta qual provider está disponível."""
-        # Prioridade: Groq (com modelos Gemini) primeiro (gratuito e melhor para cálculos), 
-        # depois Ollama, depois OpenAI
+        # Cache de extrações (opt-in)
+        self.cache = ExtractionCache() if use_cache else None
         
-        # Prioridade: Groq primeiro (gratuito, rápido, e suporta Gemini para cálculos precisos)
-        # Verifica Groq (gratuito, muito rápido, suporta modelos Gemini)
-        if os.getenv("GROQ_API_KEY"):
-            return "groq"
+        # Template do prompt (compartilhado entre instâncias), já com as instruções de formato
+        # fixadas - o invoke só substitui o texto do contrato. Com structured output nativo
+        # (OpenAI) ou modo JSON (Groq), o schema completo sai do prompt e a validade do JSON
+        # é garantida pelo provider
+        self._modo_saida = _MODO_SAIDA_POR_PROVIDER.get(self.provider, "schema")
+        self._format_instructions, self.prompt_template, self._prompt_tokens = _preparar_prompt(
+            self.output_parser, self._modo_saida
+        )
+        cadeias = [self._montar_cadeias(llm) for llm in self._llm_pool]
+        # _saidas: LLM + parsing, sem o template (recebe a lista de mensagens nas correções)
+        self._saidas = [c[0] for c in cadeias]
+        self._chains = [self.prompt_template | saida for saida in self._saidas]
+        self.chain = self._chains[0]
+        self._stream_chains = [c[1] for c in cadeias]
+        self.stream_chain = self._stream_chains[0]
         
-        # Verifica Ollama (local, sempre disponível se instalado)
-        try:
-            import ollama
-            # Testa se o servidor está rodando
-            ollama.list()
-            return "ollama"
-        except:
-            pass
+        # Tokens fixos do prompt (contados uma vez) definem quanto sobra para o texto do contrato
+        self._max_tokens_texto = self._orcamento_tokens_texto()
         
-        # Verifica OpenAI (mais caro, mas funciona bem)
-        if os.getenv("OPENAI_API_KEY"):
-            return "openai"
+        # Limitador client-side: segura a requisição até haver TPM disponível, em vez de tomar 429
+        # (o limite de TPM é por chave, então a capacidade soma as chaves configuradas)
+        tpm = _TPM_POR_PROVIDER.get(self.provider)
+        self._limiter = TokenBucket(tpm * len(self._llm_pool), 60) if tpm else None
         
-        raise ValueError(
-            "Nenhum provider de IA configurado. Configure pelo menos um:\n"
-            "- Groq (GRATUITO, suporta Gemini): GROQ_API_KEY no .env\n"
-            "- Ollama (GRÁTIS, local): Instale em https://ollama.ai\n"
-            "- OpenAI: OPENAI_API_KEY no .env"
-        )
+        # Uso de tokens por chave na janela atual de 60s: [tokens_usados, inicio_da_janela]
+        self._key_usage = [[0, time.monotonic()] for _ in self._llm_pool]
+        self._key_usage_lock = threading.Lock()
+
     
     def _inicializar_llm(self, model_name: Optional[str]):
         """Inicializa o LLM baseado no provider."""
         if self.provider == "ollama":
-            from langchain_ollama import ChatOllama
+            if ChatOllama is None:
+                raise ImportError("Pacote langchain-ollama não instalado (pip install langchain-ollama)")
             model = model_name or "llama3.2"  # Modelo gratuito e bom
             return ChatOllama(model=model, temperature=0.0)
         
         elif self.provider == "groq":
-            from langchain_groq import ChatGroq
-            api_key = os.getenv("GROQ_API_KEY")
-            if not api_key:
-                raise ValueError("GROQ_API_KEY não encontrada no .env")
+            if ChatGroq is None:
+                raise ImportError("Pacote langchain-groq não instalado (pip install langchain-groq)")
+            # GROQ_API_KEYS (separadas por vírgula) distribui as chamadas entre várias chaves
+            chaves = os.getenv("GROQ_API_KEYS") or os.getenv("GROQ_API_KEY", "")
+            api_keys = [k.strip() for k in chaves.split(",") if k.strip()]
+            if not api_keys:
+                raise ValueError("GROQ_API_KEY (ou GROQ_API_KEYS) não encontrada no .env")
             # Modelos disponíveis no Groq:
             # - Llama: llama-3.1-8b-instant (rápido - padrão econômico), llama-3.3-70b-versatile (preciso)
             # - Mixtral: mixtral-8x7b-32768 (balanceado)
@@ -171,7 +435,18 @@ Contrato:
             ultimo_erro = None
             for modelo in modelos_disponiveis:
                 try:
-                    return ChatGroq(model=modelo, temperature=0.0, groq_api_key=api_key)
+                    llm = ChatGroq(
+                        model=modelo, temperature=0.0, groq_api_key=api_keys[0],
+                        http_client=_HTTPX_SYNC
+                    )
+                    self._llm_pool = [llm] + [
+                        ChatGroq(
+                            model=modelo, temperature=0.0, groq_api_key=k,
+                            http_client=_HTTPX_SYNC
+                        )
+                        for k in api_keys[1:]
+                    ]
+                    return llm
                 except Exception as e:
                     erro_str = str(e).lower()
                     if "decommissioned" in erro_str or "not found" in erro_str:
@@ -187,16 +462,41 @@ Contrato:
             raise Exception(f"Nenhum modelo Groq funcionou. Tentei: {modelos_disponiveis}")
         
         elif self.provider == "openai":
-            from langchain_openai import ChatOpenAI
+            if ChatOpenAI is None:
+                raise ImportError("Pacote langchain-openai não instalado (pip install langchain-openai)")
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 raise ValueError("OPENAI_API_KEY não encontrada no .env")
             model = model_name or "gpt-4o-mini"
-            return ChatOpenAI(model=model, temperature=0.0, api_key=api_key)
+            return ChatOpenAI(
+                model=model, temperature=0.0, api_key=api_key,
+                http_client=_HTTPX_SYNC,
+                callbacks=[_LogCachePrompt()]
+            )
         
         else:
             raise ValueError(f"Provider desconhecido: {self.provider}")
     
+    def _montar_cadeias(self, llm) -> tuple:
+        """
+        Monta (saída, cadeia de streaming) para um LLM do pool, conforme o modo de saída.
+        
+        A saída (LLM + parsing, sem o template) devolve ContratoInfo; a cadeia de streaming
+        emite o JSON parcial (dict) à medida que os tokens chegam.
+        """
+        if self._modo_saida == "nativo":
+            # Structured output: o parsing fica dentro do LLM (parcial em streaming)
+            estruturado = llm.with_structured_output(ContratoInfo, method="function_calling")
+            return estruturado, self.prompt_template | estruturado
+        
+        if self._modo_saida == "json":
+            # response_format={"type": "json_object"}: o provider só devolve JSON válido
+            estruturado = llm.with_structured_output(ContratoInfo, method="json_mode")
+            llm_json = llm.bind(response_format={"type": "json_object"})
+            return estruturado, self.prompt_template | llm_json | JsonOutputParser()
+        
+        return llm | self.output_parser, self.prompt_template | llm | JsonOutputParser()
+    
     def _limpar_observacoes(self, texto: str) -> str:
         """
         Limpa apenas problemas específicos de formatação, sem alterar texto já correto.
@@ -205,23 +505,19 @@ Contrato:
         if not texto:
             return texto
         
-        import re
-        
         # Apenas corrige valores monetários que não usam R$ (padrão brasileiro)
         # "R 19.653" ou "R19.653" -> "R$ 19.653"
-        texto = re.sub(r'\bR\s+(\d)', r'R$ \1', texto)
-        texto = re.sub(r'\bR(\d)', r'R$ \1', texto)
+        texto = _RE_R_SPACE.sub(r'R$ \1', texto)
+        texto = _RE_R_DIGIT.sub(r'R$ \1', texto)
         
         # Remove apenas espaços múltiplos (preserva quebras de linha)
-        texto = re.sub(r'[ \t]+', ' ', texto)
+        texto = _RE_MULTISPACE.sub(' ', texto)
         
         # Remove espaços no início e fim de linhas (mas preserva quebras de linha)
-        linhas = texto.split('\n')
-        linhas = [linha.strip() for linha in linhas]
-        texto = '\n'.join(linhas)
+        texto = _RE_LINE_STRIP.sub('', texto)
         
         # Remove linhas vazias múltiplas (mantém no máximo uma linha vazia)
-        texto = re.sub(r'\n\n\n+', '\n\n', texto)
+        texto = _RE_MULTINEWLINE.sub('\n\n', texto)
         
         return texto.strip()
     
@@ -387,12 +683,31 @@ Contrato:
         
         return None
     
-    def _aplicar_recalculo_bacen(self, result: ContratoInfo) -> ContratoInfo:
+    @staticmethod
+    def _price_local(valor: float, taxa_mensal: float, n: int) -> float:
+        """
+        Calcula a parcela pela Tabela Price localmente (sem tabela de amortização).
+        
+        Args:
+            valor: Valor principal (PV)
+            taxa_mensal: Taxa mensal em decimal (ex: 0.025 = 2.5% a.m.)
+            n: Número de parcelas
+            
+        Returns:
+            Valor da parcela (PMT)
+        """
+        if taxa_mensal <= 0:
+            return valor / n
+        fator = (1 + taxa_mensal) ** n
+        return valor * (taxa_mensal * fator) / (fator - 1)
+    
+    def _aplicar_recalculo_bacen(self, result: ContratoInfo, forcar: bool = False) -> ContratoInfo:
         """
         Aplica recálculo com dados do BACEN ao resultado da extração.
         
         Args:
             result: Resultado da extração do contrato
+            forcar: Se True, recalcula mesmo quando a parcela já confere com a Tabela Price
             
         Returns:
             Resultado com recálculo aplicado (se possível)
@@ -402,6 +717,21 @@ Contrato:
                 result.taxa_juros and result.data_vencimento_primeira):
             return result
         
+        tipo_taxa = "prefixada"  # Assume prefixada por padrão (pode ser detectado no futuro)
+        
+        # Verificação rápida: se a parcela do contrato já confere com a Price local
+        # (diferença < R$ 1,00), o recálculo completo não traz informação nova.
+        # recalculo_bacen fica None (como quando faltam dados): um dict parcial quebraria
+        # quem lê as chaves do resultado completo (valores, taxas, comparação)
+        if not forcar and tipo_taxa == "prefixada" and result.valor_parcela:
+            parcela_local = self._price_local(
+                result.valor_divida, result.taxa_juros / 100.0, result.quantidade_parcelas
+            )
+            if abs(parcela_local - result.valor_parcela) < 1.0:
+                print(f"[OK] Parcela do contrato confere com a Tabela Price (R$ {parcela_local:.2f}) - "
+                      f"recálculo BACEN dispensado")
+                return result
+        
         try:
             print("[INFO] Iniciando recálculo com dados do BACEN...")
             recalculo = self.recalculador.recalcular_contrato(
@@ -411,7 +741,7 @@ Contrato:
                 valor_parcela_contrato=result.valor_parcela,
                 data_contratacao=result.data_vencimento_primeira,
                 data_primeira_parcela=result.data_vencimento_primeira,
-                tipo_taxa="prefixada",  # Assume prefixada por padrão (pode ser detectado no futuro)
+                tipo_taxa=tipo_taxa,
                 indexador="selic"
             )
             
@@ -438,187 +768,531 @@ Contrato:
         
         return result
     
-    def _truncar_texto_inteligente(self, text: str, max_chars: int = 2500) -> str:
+    def _orcamento_tokens_texto(self) -> int:
+        """
+        Calcula quantos tokens do contrato cabem em uma chamada.
+        
+        Para providers com limite de TPM (ex: Groq, 6000 TPM), o orçamento é
+        limite - tokens do prompt - reserva para a resposta.
+        """
+        tpm = _TPM_POR_PROVIDER.get(self.provider)
+        if tpm is None:
+            return _MAX_TOKENS_TEXTO
+        return max(500, min(_MAX_TOKENS_TEXTO, tpm - self._prompt_tokens - _TOKENS_RESERVA_RESPOSTA))
+    
+    def _truncar_texto_inteligente(self, text: str, max_tokens: int = _MAX_TOKENS_TEXTO) -> str:
         """
         Trunca o texto mantendo início e fim (onde geralmente estão as informações importantes).
         Limite do Groq: 6000 tokens/minuto (TPM) para modelo llama-3.1-8b-instant.
-        """
-
-        if len(text) <= max_chars:
-            return text
         
-        # Calcula proporção para manter início e fim
+        Conta tokens reais com tiktoken; sem tiktoken, usa a estimativa 1 token ≈ 4 chars.
+        """
         # Mantém mais do início (onde estão dados principais) e menos do fim
-        chars_inicio = int(max_chars * 0.65)  # 65% no início
-        chars_fim = int(max_chars * 0.30)     # 30% no fim (5% para mensagem de truncamento)
-        
-        inicio = text[:chars_inicio]
-        fim = text[-chars_fim:]
+        # 65% no início, 30% no fim (5% para mensagem de truncamento)
+        enc = _tokenizador()
+        if enc is None:
+            max_chars = max_tokens * 4
+            if len(text) <= max_chars:
+                return text
+            inicio = text[:int(max_chars * 0.65)]
+            fim = text[-int(max_chars * 0.30):]
+        else:
+            tokens = enc.encode(text)
+            if len(tokens) <= max_tokens:
+                return text
+            inicio = enc.decode(tokens[:int(max_tokens * 0.65)])
+            fim = enc.decode(tokens[-int(max_tokens * 0.30):])
         
         return f"{inicio}\n\n[... texto intermediário removido para reduzir tamanho ...]\n\n{fim}"
     
+    def _chave_cache(self, processed_text: str) -> Optional[str]:
+        """Chave do cache de extração para o texto processado (None se o cache estiver desativado)."""
+        if self.cache is None:
+            return None
+        return ExtractionCache.make_key(self.provider, self.model_name, _PROMPT_VERSION, processed_text)
+    
+    def _buscar_no_cache(self, chave: Optional[str]) -> Optional[ContratoInfo]:
+        """Retorna a extração em cache para a chave, se houver."""
+        if chave is None:
+            return None
+        em_cache = self.cache.get(chave)
+        if em_cache is None:
+            return None
+        print("[OK] Extração encontrada no cache - chamada à IA dispensada")
+        return ContratoInfo.model_validate(em_cache)
+    
+    def _pos_processar_resultado(self, result: ContratoInfo, text: str, chave_cache: Optional[str] = None) -> ContratoInfo:
+        """
+        Completa o resultado da IA: detecta banco por CNPJ (se faltou) e aplica recálculo BACEN.
+        
+        Args:
+            result: Resultado retornado pela cadeia do LLM
+            text: Texto original do contrato (antes de limpeza/truncamento)
+            chave_cache: Se informada, grava o resultado da IA no cache antes do pós-processamento
+            
+        Returns:
+            Resultado pós-processado
+        """
+        if chave_cache is not None:
+            self.cache.put(chave_cache, result.model_dump())
+        
+        # Tenta detectar banco por CNPJ se não foi identificado pela IA
+        if not result.banco_credor or result.banco_credor.strip() == "":
+            banco_detectado = self._detectar_banco_por_cnpj(text)
+            if banco_detectado:
+                result.banco_credor = banco_detectado
+                print(f"[DEBUG] DEBUG: Banco detectado por CNPJ: {banco_detectado}")
+        
+        # Log de debug
+        if result.banco_credor:
+            print(f"[OK] DEBUG: Banco identificado: {result.banco_credor}")
+        else:
+            print(f"[WARN] DEBUG: Banco NÃO identificado no contrato")
+        
+        # Aplica recálculo com BACEN
+        result = self._aplicar_recalculo_bacen(result)
+        
+        # Não altera observações - o JSON já vem correto da IA
+        # A função _limpar_observacoes só deve ser chamada manualmente se necessário
+        
+        return result
+    
+    async def _apos_processar_resultado(self, result: ContratoInfo, text: str, chave_cache: Optional[str] = None) -> ContratoInfo:
+        """
+        Versão assíncrona de _pos_processar_resultado: roda em uma thread, porque o recálculo
+        BACEN consulta a API do BACEN (requests síncrono) e a gravação no cache é em disco.
+        """
+        return await asyncio.to_thread(self._pos_processar_resultado, result, text, chave_cache)
+    
+    @staticmethod
+    def _erro_de_parsing(erro: BaseException) -> bool:
+        """
+        Indica se o erro veio do parsing do JSON (incompleto ou inválido).
+        
+        Decide pelo tipo, não pela mensagem: erros do provider costumam citar "json" no texto
+        (corpo da resposta, response_format, json_validate_failed) sem que haja um JSON do
+        modelo para corrigir.
+        """
+        return isinstance(erro, (OutputParserException, ValidationError))
+    
+    @staticmethod
+    def _erro_de_tamanho(error_msg: str) -> bool:
+        """Indica se o erro foi de payload grande demais (413) - a requisição sozinha excede o limite."""
+        return "413" in error_msg or "too large" in error_msg.lower()
+    
+    @staticmethod
+    def _erro_rate_limit(error_msg: str) -> bool:
+        """Indica se o erro foi de rate limit do provider."""
+        msg = error_msg.lower()
+        return "rate_limit" in msg or "429" in error_msg or "tokens per day" in msg or "rate limit reached" in msg
+    
+    @classmethod
+    def _erro_rate_limit_transitorio(cls, error_msg: str) -> bool:
+        """Indica rate limit que passa sozinho (ex: TPM/RPM), ao contrário de 413 e limite diário."""
+        if cls._erro_de_tamanho(error_msg) or "per day" in error_msg.lower():
+            return False
+        return cls._erro_rate_limit(error_msg)
+    
+    def _estimar_tokens_requisicao(self, processed_text: str) -> int:
+        """Estima os tokens consumidos por uma chamada (prompt + contrato + resposta)."""
+        return self._prompt_tokens + _contar_tokens(processed_text) + _TOKENS_RESERVA_RESPOSTA
+    
+    def _selecionar_chave(self, tokens: int) -> int:
+        """
+        Escolhe a chave de API menos utilizada na janela de 60s e contabiliza os tokens estimados.
+        
+        Returns:
+            Índice da chave em _llm_pool / _chains
+        """
+        with self._key_usage_lock:
+            agora = time.monotonic()
+            for uso in self._key_usage:
+                if agora - uso[1] >= 60:
+                    uso[0] = 0
+                    uso[1] = agora
+            idx = min(range(len(self._key_usage)), key=lambda i: self._key_usage[i][0])
+            self._key_usage[idx][0] += tokens
+            return idx
+    
+    @_retry_rate_limit
+    def _invocar(self, processed_text: str) -> ContratoInfo:
+        """
+        Invoca a cadeia respeitando o limitador de TPM (com backoff em 429 transitório).
+        
+        Usa a chave menos utilizada; se ela responder 429, tenta as demais antes do backoff.
+        """
+        tokens = self._estimar_tokens_requisicao(processed_text)
+        if self._limiter:
+            self._limiter.acquire(tokens)
+        idx = self._selecionar_chave(tokens)
+        total = len(self._chains)
+        for tentativa in range(total):
+            i = (idx + tentativa) % total
+            try:
+                return self._chains[i].invoke({"contract_text": processed_text})
+            except Exception as e:
+                if tentativa == total - 1 or not self._erro_rate_limit_transitorio(str(e)):
+                    raise
+                print(f"[WARN] Chave de API {i + 1}/{total} em rate limit, tentando a próxima")
+    
+    @_retry_rate_limit
+    async def _ainvocar(self, processed_text: str) -> ContratoInfo:
+        """Versão assíncrona de _invocar."""
+        tokens = self._estimar_tokens_requisicao(processed_text)
+        if self._limiter:
+            await self._limiter.aacquire(tokens)
+        idx = self._selecionar_chave(tokens)
+        total = len(self._chains)
+        for tentativa in range(total):
+            i = (idx + tentativa) % total
+            try:
+                return await self._chains[i].ainvoke({"contract_text": processed_text})
+            except Exception as e:
+                if tentativa == total - 1 or not self._erro_rate_limit_transitorio(str(e)):
+                    raise
+                print(f"[WARN] Chave de API {i + 1}/{total} em rate limit, tentando a próxima")
+    
+    @_retry_rate_limit
+    async def _astream_invocar(
+        self, processed_text: str, on_partial: Optional[Callable[[dict], None]] = None
+    ) -> ContratoInfo:
+        """Invoca a cadeia em streaming, repassando o JSON parcial a on_partial a cada trecho."""
+        tokens = self._estimar_tokens_requisicao(processed_text)
+        if self._limiter:
+            await self._limiter.aacquire(tokens)
+        stream_chain = self._stream_chains[self._selecionar_chave(tokens)]
+        parcial: dict = {}
+        async for trecho in stream_chain.astream({"contract_text": processed_text}):
+            # Structured output nativo emite ContratoInfo parciais; as demais cadeias, dicts
+            parcial = trecho.model_dump(exclude_unset=True) if isinstance(trecho, ContratoInfo) else trecho
+            if on_partial:
+                on_partial(parcial)
+        return ContratoInfo.model_validate(parcial)
+    
+    def _mensagens_feedback(self, processed_text: str, erro: Exception) -> list:
+        """
+        Monta a conversa para a nova tentativa: prompt original, a resposta que falhou
+        (como AIMessage) e o erro de validação, para o modelo corrigir o que de fato enviou.
+        
+        Sem a resposta bruta no erro (ex: structured output nativo), pedir correção de uma
+        resposta que o modelo não vê não ajuda - refaz só com o prompt original.
+        """
+        mensagens = self.prompt_template.format_messages(contract_text=processed_text)
+        resposta = getattr(erro, "llm_output", None)
+        if resposta:
+            mensagens.append(AIMessage(content=resposta))
+            mensagens.append(HumanMessage(content=_MSG_FEEDBACK.format(erro=erro)))
+        return mensagens
+    
+    def _corrigir_com_feedback(self, processed_text: str, erro: Exception) -> ContratoInfo:
+        """
+        Reenvia a conversa com a resposta inválida e o erro de validação, pedindo ao modelo
+        que corrija o JSON.
+        
+        Até _TENTATIVAS_FEEDBACK tentativas, com espera crescente; o texto do contrato é
+        mantido completo. Propaga o último erro se nenhuma resposta for válida.
+        """
+        for tentativa in range(_TENTATIVAS_FEEDBACK):
+            print(f"[WARN] Resposta fora do schema - pedindo correção ao modelo ({tentativa + 1}/{_TENTATIVAS_FEEDBACK})")
+            mensagens = self._mensagens_feedback(processed_text, erro)
+            time.sleep(1.0 * (tentativa + 1))
+            tokens = self._estimar_tokens_requisicao(processed_text)
+            if self._limiter:
+                self._limiter.acquire(tokens)
+            try:
+                return self._saidas[self._selecionar_chave(tokens)].invoke(mensagens)
+            except Exception as e:
+                if not self._erro_de_parsing(e):
+                    raise
+                erro = e
+        raise erro
+    
+    async def _acorrigir_com_feedback(self, processed_text: str, erro: Exception) -> ContratoInfo:
+        """Versão assíncrona de _corrigir_com_feedback."""
+        for tentativa in range(_TENTATIVAS_FEEDBACK):
+            print(f"[WARN] Resposta fora do schema - pedindo correção ao modelo ({tentativa + 1}/{_TENTATIVAS_FEEDBACK})")
+            mensagens = self._mensagens_feedback(processed_text, erro)
+            await asyncio.sleep(1.0 * (tentativa + 1))
+            tokens = self._estimar_tokens_requisicao(processed_text)
+            if self._limiter:
+                await self._limiter.aacquire(tokens)
+            try:
+                return await self._saidas[self._selecionar_chave(tokens)].ainvoke(mensagens)
+            except Exception as e:
+                if not self._erro_de_parsing(e):
+                    raise
+                erro = e
+        raise erro
+    
+    def _erro_final(self, erro: Exception, ultimo_erro: Optional[Exception] = None) -> Exception:
+        """Monta a exceção final quando todas as tentativas de extração falharam."""
+        error_msg = str(erro)
+        if self._erro_de_parsing(erro):
+            return Exception(f"Erro ao extrair informações do contrato (JSON incompleto ou inválido): {str(ultimo_erro)}")
+        
+        if self._erro_de_tamanho(error_msg):
+            if ultimo_erro:
+                return Exception(
+                    f"O contrato é muito grande para processar. Mesmo reduzindo o tamanho, ainda excede o limite de tokens do Groq (6000 TPM). "
+                    f"Por favor, tente com um contrato menor ou configure outro provedor de IA (OpenAI, Gemini, Ollama) no arquivo .env. "
+                    f"Erro detalhado: {str(ultimo_erro)}"
+                )
+            return Exception(f"Erro ao processar contrato (muito grande): {error_msg}")
+        
+        # Rate limit por minuto que persistiu mesmo após o backoff
+        if self._erro_rate_limit_transitorio(error_msg):
+            return Exception(
+                f"Limite de tokens/requisições por minuto do provider excedido, mesmo após novas tentativas. "
+                f"Por favor, aguarde alguns instantes e tente novamente. "
+                f"Erro detalhado: {error_msg}"
+            )
+        
+        # Trata erro de rate limit do Groq
+        if self._erro_rate_limit(error_msg):
+            return Exception(
+                f"Limite de tokens do Groq excedido. O limite diário de tokens foi atingido. "
+                f"Por favor, tente novamente mais tarde ou configure outro provedor de IA (OpenAI, Gemini, Ollama) no arquivo .env. "
+                f"Erro detalhado: {error_msg}"
+            )
+        
+        return Exception(f"Erro ao extrair informações do contrato: {error_msg}")
+    
     def extract_from_text(self, text: str) -> ContratoInfo:
         """Extrai informações de um contrato a partir de texto."""
         if not text or not text.strip():
             raise ValueError("Texto do contrato não pode estar vazio")
         
-        processed_text = self.document_processor.clean_text(text)
+        original_cleaned = self.document_processor.clean_text(text)
         
         # Trunca o texto se necessário para não exceder limites de tokens (ex: 6000 TPM do Groq)
-        # 1 token ≈ 4 chars. Para deixar margem para um prompt de ~1500 tokens,
-        # usamos um limite de 2500 caracteres (aprox 600-800 tokens) para o texto.
-        processed_text = self._truncar_texto_inteligente(processed_text, max_chars=2500)
-
+        # O orçamento já desconta os tokens do prompt e a reserva para a resposta.
+        processed_text = self._truncar_texto_inteligente(original_cleaned, max_tokens=self._max_tokens_texto)
         
-        chain = self.prompt_template | self.llm | self.output_parser
+        chave_cache = self._chave_cache(processed_text)
+        em_cache = self._buscar_no_cache(chave_cache)
+        if em_cache is not None:
+            return self._pos_processar_resultado(em_cache, text)
         
         try:
-            result = chain.invoke({
-                "contract_text": processed_text,
-                "format_instructions": self.output_parser.get_format_instructions()
-            })
-            
-            # Tenta detectar banco por CNPJ se não foi identificado pela IA
-            if not result.banco_credor or result.banco_credor.strip() == "":
-                banco_detectado = self._detectar_banco_por_cnpj(text)
-                if banco_detectado:
-                    result.banco_credor = banco_detectado
-                    print(f"[DEBUG] DEBUG: Banco detectado por CNPJ: {banco_detectado}")
-            
-            # Log de debug
-            if result.banco_credor:
-                print(f"[OK] DEBUG: Banco identificado: {result.banco_credor}")
-            else:
-                print(f"[WARN] DEBUG: Banco NÃO identificado no contrato")
-            
-            # Aplica recálculo com BACEN
-            result = self._aplicar_recalculo_bacen(result)
-            
-            # Não altera observações - o JSON já vem correto da IA
-            # A função _limpar_observacoes só deve ser chamada manualmente se necessário
-            
-            return result
+            result = self._invocar(processed_text)
+            return self._pos_processar_resultado(result, text, chave_cache)
         except Exception as e:
             error_msg = str(e)
+            ultimo_erro = None
             
-            # Se for erro de parsing (JSON incompleto ou validação), tenta novamente com texto menor
-            if "Failed to parse" in error_msg or "parse" in error_msg.lower() or "json" in error_msg.lower() or "validation error" in error_msg.lower():
-                # Tenta novamente com texto menor para evitar corte do JSON
-                original_cleaned = self.document_processor.clean_text(text)
-                processed_text = self._truncar_texto_inteligente(original_cleaned, max_chars=3000)
+            # JSON fora do schema: devolve o erro de validação ao modelo para ele corrigir
+            # Se for muito grande (413), reduz progressivamente
+            # (429 transitório já foi repetido com backoff em _invocar)
+            if self._erro_de_parsing(e):
                 try:
-                    result = chain.invoke({
-                        "contract_text": processed_text,
-                        "format_instructions": self.output_parser.get_format_instructions()
-                    })
-                    
-                    # Tenta detectar banco por CNPJ se não foi identificado pela IA
-                    if not result.banco_credor or result.banco_credor.strip() == "":
-                        banco_detectado = self._detectar_banco_por_cnpj(text)
-                        if banco_detectado:
-                            result.banco_credor = banco_detectado
-                            print(f"[DEBUG] Banco detectado por CNPJ: {banco_detectado}")
-                    
-                    # Log de debug
-                    if result.banco_credor:
-                        print(f"[OK] DEBUG: Banco identificado: {result.banco_credor}")
-                    else:
-                        print(f"[WARN] DEBUG: Banco NÃO identificado no contrato")
-
-                    
-                    # Aplica recálculo com BACEN
-                    result = self._aplicar_recalculo_bacen(result)
-                    
-                    return result
+                    result = self._corrigir_com_feedback(processed_text, e)
+                    return self._pos_processar_resultado(result, text, chave_cache)
                 except Exception as e2:
-                    # Se ainda falhar, tenta com texto ainda menor
-                    processed_text = self._truncar_texto_inteligente(original_cleaned, max_chars=2000)
+                    ultimo_erro = e2
+            elif self._erro_de_tamanho(error_msg):
+                for fracao in _FRACOES_TAMANHO:
                     try:
-                        result = chain.invoke({
-                            "contract_text": processed_text,
-                            "format_instructions": self.output_parser.get_format_instructions()
-                        })
-                        
-                        # Tenta detectar banco por CNPJ se não foi identificado pela IA
-                        if not result.banco_credor or result.banco_credor.strip() == "":
-                            banco_detectado = self._detectar_banco_por_cnpj(text)
-                            if banco_detectado:
-                                result.banco_credor = banco_detectado
-                                print(f"[DEBUG] DEBUG: Banco detectado por CNPJ: {banco_detectado}")
-                        
-                        # Log de debug
-                        if result.banco_credor:
-                            print(f"[OK] DEBUG: Banco identificado: {result.banco_credor}")
-                        else:
-                            print(f"[WARN] DEBUG: Banco NÃO identificado no contrato")
-                        
-                        # Aplica recálculo com BACEN
-                        result = self._aplicar_recalculo_bacen(result)
-                        
-                        return result
-                    except Exception as e3:
-                        raise Exception(f"Erro ao extrair informações do contrato (JSON incompleto ou inválido): {str(e3)}")
+                        processed_text_reduzido = self._truncar_texto_inteligente(
+                            original_cleaned, max_tokens=int(self._max_tokens_texto * fracao)
+                        )
+                        result = self._invocar(processed_text_reduzido)
+                        return self._pos_processar_resultado(result, text, chave_cache)
+                    except Exception as e2:
+                        # Ao reduzir por tamanho, outro tipo de erro é propagado
+                        if not self._erro_de_tamanho(str(e2)):
+                            raise e2
+                        ultimo_erro = e2
             
-            if "413" in error_msg or "too large" in error_msg.lower() or "tokens per minute" in error_msg.lower() or "tpm" in error_msg.lower():
-                # Se ainda for muito grande, reduz progressivamente
-                # Usa o texto original limpo, não o já truncado
-                original_cleaned = self.document_processor.clean_text(text)
-                # Tenta com tamanhos menores: 2000, 1500, 1000
-                tamanhos = [2000, 1500, 1000]
-                ultimo_erro = None
-                
-                for tamanho in tamanhos:
+            raise self._erro_final(e, ultimo_erro)
+    
+    async def aextract_from_text(self, text: str) -> ContratoInfo:
+        """
+        Versão assíncrona de extract_from_text (usa chain.ainvoke).
+        
+        Mantém os mesmos fallbacks do método síncrono (correção com feedback
+        para JSON inválido, frações do orçamento de tokens para 413).
+        """
+        if not text or not text.strip():
+            raise ValueError("Texto do contrato não pode estar vazio")
+        
+        original_cleaned = self.document_processor.clean_text(text)
+        processed_text = self._truncar_texto_inteligente(original_cleaned, max_tokens=self._max_tokens_texto)
+        
+        chave_cache = self._chave_cache(processed_text)
+        em_cache = self._buscar_no_cache(chave_cache)
+        if em_cache is not None:
+            return await self._apos_processar_resultado(em_cache, text)
+        
+        try:
+            result = await self._ainvocar(processed_text)
+            return await self._apos_processar_resultado(result, text, chave_cache)
+        except Exception as e:
+            error_msg = str(e)
+            ultimo_erro = None
+            
+            if self._erro_de_parsing(e):
+                try:
+                    result = await self._acorrigir_com_feedback(processed_text, e)
+                    return await self._apos_processar_resultado(result, text, chave_cache)
+                except Exception as e2:
+                    ultimo_erro = e2
+            elif self._erro_de_tamanho(error_msg):
+                for fracao in _FRACOES_TAMANHO:
                     try:
-                        processed_text_reduzido = self._truncar_texto_inteligente(original_cleaned, max_chars=tamanho)
-                        result = chain.invoke({
-                            "contract_text": processed_text_reduzido,
-                            "format_instructions": self.output_parser.get_format_instructions()
-                        })
-                        
-                        # Tenta detectar banco por CNPJ se não foi identificado pela IA
-                        if not result.banco_credor or result.banco_credor.strip() == "":
-                            banco_detectado = self._detectar_banco_por_cnpj(text)
-                            if banco_detectado:
-                                result.banco_credor = banco_detectado
-                                print(f"[DEBUG] DEBUG: Banco detectado por CNPJ: {banco_detectado}")
-                        
-                        # Log de debug
-                        if result.banco_credor:
-                            print(f"[OK] DEBUG: Banco identificado: {result.banco_credor}")
-                        else:
-                            print(f"[WARN] DEBUG: Banco NÃO identificado no contrato")
-                        
-                        # Aplica recálculo com BACEN
-                        result = self._aplicar_recalculo_bacen(result)
-                        
-                        return result
+                        processed_text_reduzido = self._truncar_texto_inteligente(
+                            original_cleaned, max_tokens=int(self._max_tokens_texto * fracao)
+                        )
+                        result = await self._ainvocar(processed_text_reduzido)
+                        return await self._apos_processar_resultado(result, text, chave_cache)
                     except Exception as e2:
-                        error_msg2 = str(e2)
-                        if "413" in error_msg2 or "too large" in error_msg2.lower() or "tokens per minute" in error_msg2.lower() or "tpm" in error_msg2.lower():
-                            ultimo_erro = e2
-                            continue
-                        else:
-                            # Outro tipo de erro, propaga
+                        if not self._erro_de_tamanho(str(e2)):
                             raise e2
-                
-                # Se todos os tamanhos falharam, lança erro explicativo
-                if ultimo_erro:
-                    raise Exception(
-                        f"O contrato é muito grande para processar. Mesmo reduzindo o tamanho, ainda excede o limite de tokens do Groq (6000 TPM). "
-                        f"Por favor, tente com um contrato menor ou configure outro provedor de IA (OpenAI, Gemini, Ollama) no arquivo .env. "
-                        f"Erro detalhado: {str(ultimo_erro)}"
-                    )
-                raise Exception(f"Erro ao processar contrato (muito grande): {error_msg}")
+                        ultimo_erro = e2
             
-            # Trata erro de rate limit do Groq
-            if "rate_limit" in error_msg.lower() or "429" in error_msg or "tokens per day" in error_msg.lower() or "rate limit reached" in error_msg.lower():
-                raise Exception(
-                    f"Limite de tokens do Groq excedido. O limite diário de tokens foi atingido. "
-                    f"Por favor, tente novamente mais tarde ou configure outro provedor de IA (OpenAI, Gemini, Ollama) no arquivo .env. "
-                    f"Erro detalhado: {error_msg}"
-                )
+            raise self._erro_final(e, ultimo_erro)
+    
+    async def aextract_from_text_stream(
+        self, text: str, on_partial: Optional[Callable[[dict], None]] = None
+    ) -> ContratoInfo:
+        """
+        Extrai em streaming: o JSON é montado enquanto o LLM ainda gera a resposta.
+        
+        Args:
+            text: Texto do contrato
+            on_partial: Callback chamado com o dict parcial a cada trecho recebido
+                (ex: para mostrar as observações progressivamente na UI)
             
-            raise Exception(f"Erro ao extrair informações do contrato: {str(e)}")
+        Returns:
+            Objeto ContratoInfo validado ao final do stream
+        """
+        if not text or not text.strip():
+            raise ValueError("Texto do contrato não pode estar vazio")
+        
+        original_cleaned = self.document_processor.clean_text(text)
+        processed_text = self._truncar_texto_inteligente(original_cleaned, max_tokens=self._max_tokens_texto)
+        
+        chave_cache = self._chave_cache(processed_text)
+        em_cache = self._buscar_no_cache(chave_cache)
+        if em_cache is not None:
+            return await self._apos_processar_resultado(em_cache, text)
+        
+        try:
+            result = await self._astream_invocar(processed_text, on_partial)
+            return await self._apos_processar_resultado(result, text, chave_cache)
+        except Exception as e:
+            error_msg = str(e)
+            # Parsing/413: recorre à extração sem streaming (correção com feedback + escada de fallback)
+            if self._erro_de_parsing(e) or self._erro_de_tamanho(error_msg):
+                print(f"[WARN] Extração em streaming falhou, tentando sem streaming: {error_msg}")
+                return await self.aextract_from_text(text)
+            raise self._erro_final(e)
+    
+    async def aextract_many(self, texts: List[str], concurrency: int = 8) -> List[ContratoInfo]:
+        """
+        Extrai vários contratos em paralelo (I/O do LLM sobreposto).
+        
+        Args:
+            texts: Textos dos contratos
+            concurrency: Máximo de chamadas simultâneas ao LLM
+            
+        Returns:
+            Lista de ContratoInfo na mesma ordem de texts
+        """
+        semaforo = asyncio.Semaphore(concurrency)
+        
+        async def _bounded(texto: str) -> ContratoInfo:
+            async with semaforo:
+                return await self.aextract_from_text(texto)
+        
+        return await asyncio.gather(*[_bounded(t) for t in texts])
+    
+    def extract_many(self, texts: List[str], concurrency: int = 8) -> List[ContratoInfo]:
+        """Wrapper síncrono de aextract_many (para chamadores fora de um event loop)."""
+        return asyncio.run(self.aextract_many(texts, concurrency=concurrency))
+    
+    def extract_batch_offline(self, texts: List[str], poll_interval: int = 30) -> List[Optional[ContratoInfo]]:
+        """
+        Extrai vários contratos via Batch API da OpenAI (processamento offline, ~50% mais barato).
+        
+        Indicado para reprocessamentos e importações históricas: não sofre limite de TPM,
+        mas o resultado pode levar até 24h.
+        
+        Args:
+            texts: Textos dos contratos
+            poll_interval: Intervalo (segundos) entre consultas ao status do lote
+            
+        Returns:
+            Lista na mesma ordem de texts (None para contratos que falharam no lote)
+        """
+        if self.provider != "openai":
+            raise ValueError(f"Extração em lote offline disponível apenas para OpenAI (provider atual: {self.provider})")
+        
+        from openai import OpenAI
+        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=_HTTPX_SYNC)
+        
+        # 1. Uma linha JSONL por contrato, com o prompt do modo JSON (lista compacta de campos)
+        # e response_format json_object - o lote não passa pelo structured output do LangChain
+        _, prompt_lote, _ = _preparar_prompt(self.output_parser, "json")
+        linhas = []
+        for i, text in enumerate(texts):
+            processed_text = self._truncar_texto_inteligente(
+                self.document_processor.clean_text(text), max_tokens=self._max_tokens_texto
+            )
+            mensagens = [
+                {"role": _PAPEIS_OPENAI[m.type], "content": m.content}
+                for m in prompt_lote.format_messages(contract_text=processed_text)
+            ]
+            linhas.append(json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model_name, "temperature": 0.0, "messages": mensagens,
+                    "response_format": {"type": "json_object"},
+                },
+            }, ensure_ascii=False))
+        
+        # 2. Envia o arquivo e cria o lote
+        arquivo = client.files.create(
+            file=("contratos.jsonl", "\n".join(linhas).encode("utf-8")),
+            purpose="batch"
+        )
+        lote = client.batches.create(
+            input_file_id=arquivo.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        print(f"[INFO] Lote OpenAI criado: {lote.id} ({len(texts)} contratos)")
+        
+        # 3. Aguarda a conclusão
+        while lote.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_interval)
+            lote = client.batches.retrieve(lote.id)
+            print(f"[INFO] Lote {lote.id}: {lote.status}")
+        
+        if lote.status != "completed":
+            raise Exception(f"Lote OpenAI {lote.id} terminou com status '{lote.status}'")
+        
+        # 4. Baixa a saída e faz o parsing de cada resposta
+        resultados: List[Optional[ContratoInfo]] = [None] * len(texts)
+        if not lote.output_file_id:
+            print(f"[WARN] Lote {lote.id} concluído sem arquivo de saída (todas as requisições falharam)")
+            return resultados
+        
+        conteudo = client.files.content(lote.output_file_id).text
+        for linha in conteudo.splitlines():
+            if not linha.strip():
+                continue
+            item = json.loads(linha)
+            i = int(item["custom_id"])
+            try:
+                resposta = item["response"]["body"]["choices"][0]["message"]["content"]
+                result = self.output_parser.parse(resposta)
+                resultados[i] = self._pos_processar_resultado(result, texts[i])
+            except Exception as e:
+                print(f"[WARN] Contrato {i} do lote não pôde ser extraído: {item.get('error') or e}")
+        
+        return resultados
     
     def extract_from_pdf(self, pdf_path: str) -> ContratoInfo:
         """Extrai informações de um contrato a partir de um arquivo PDF."""
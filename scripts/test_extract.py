@@ -3,6 +3,9 @@ import json
 import os
 import sys
 
+# Reuse one session (and its connection pool) across requests
+_SESSION = requests.Session()
+
 def test_extract(file_path):
     url = "http://localhost:8000/api/extract"
     
@@ -18,7 +21,7 @@ def test_extract(file_path):
         
         try:
             # Send POST request
-            response = requests.post(url, files=files)
+            response = _SESSION.post(url, files=files)
             
             # Check response
             if response.status_code == 200:
@@ -2,8 +2,7 @@
 """
 Script de teste para verificar se os endpoints de relatórios estão funcionando.
 """
-import urllib.request
-import urllib.error
+import httpx
 import json
 import sys
 
@@ -15,6 +14,9 @@ API_URL = os.getenv("PYTHON_API_URL", "http://localhost:8000")
 if len(sys.argv) > 1:
     API_URL = sys.argv[1]
 
+# Cliente único: os testes reutilizam a mesma conexão em vez de abrir uma por requisição
+_CLIENT = httpx.Client(timeout=10)
+
 def test_estatisticas_banco():
     """Testa o endpoint de estatísticas por banco."""
     print("=" * 60)
@@ -24,30 +26,29 @@ def test_estatisticas_banco():
     url = f"{API_URL}/api/relatorios/estatisticas-banco"
     
     try:
-        req = urllib.request.Request(url)
-        with urllib.request.urlopen(req, timeout=10) as response:
-            status_code = response.getcode()
-            print(f"Status Code: {status_code}")
-            
-            if status_code == 200:
-                data = json.loads(response.read().decode('utf-8'))
-                print(f"✅ Sucesso! Retornou {len(data)} bancos")
-                if data:
-                    print("\n📊 Dados recebidos:")
-                    print(json.dumps(data, indent=2, ensure_ascii=False))
-                else:
-                    print("ℹ️  Lista vazia (nenhum dado no banco ainda)")
-                return True
+        response = _CLIENT.get(url)
+        status_code = response.status_code
+        print(f"Status Code: {status_code}")
+        
+        if status_code == 200:
+            data = response.json()
+            print(f"✅ Sucesso! Retornou {len(data)} bancos")
+            if data:
+                print("\n📊 Dados recebidos:")
+                print(json.dumps(data, indent=2, ensure_ascii=False))
             else:
-                print(f"❌ Erro {status_code}")
-                return False
-                
-    except urllib.error.URLError as e:
-        if "Connection refused" in str(e) or "Name or service not known" in str(e):
-            print(f"❌ Erro: Não foi possível conectar à API em {API_URL}")
-            print("   Certifique-se de que a API está rodando!")
+                print("ℹ️  Lista vazia (nenhum dado no banco ainda)")
+            return True
         else:
-            print(f"❌ Erro de conexão: {e}")
+            print(f"❌ Erro {status_code}")
+            return False
+            
+    except httpx.ConnectError:
+        print(f"❌ Erro: Não foi possível conectar à API em {API_URL}")
+        print("   Certifique-se de que a API está rodando!")
+        return False
+    except httpx.HTTPError as e:
+        print(f"❌ Erro de conexão: {e}")
         return False
     except Exception as e:
         print(f"❌ Erro inesperado: {e}")
@@ -64,27 +65,26 @@ def test_mapa_divida():
     url = f"{API_URL}/api/relatorios/mapa-divida?ano={now.year}&mes={now.month}"
     
     try:
-        req = urllib.request.Request(url)
-        with urllib.request.urlopen(req, timeout=10) as response:
-            status_code = response.getcode()
-            print(f"Status Code: {status_code}")
-            
-            if status_code == 200:
-                data = json.loads(response.read().decode('utf-8'))
-                print(f"✅ Sucesso!")
-                print(f"Total de análises: {data.get('resumo', {}).get('total_analises', 0)}")
-                print("\n📊 Resumo:")
-                print(json.dumps(data.get('resumo', {}), indent=2, ensure_ascii=False))
-                return True
-            else:
-                print(f"❌ Erro {status_code}")
-                return False
-                
-    except urllib.error.URLError as e:
-        if "Connection refused" in str(e) or "Name or service not known" in str(e):
-            print(f"❌ Erro: Não foi possível conectar à API em {API_URL}")
+        response = _CLIENT.get(url)
+        status_code = response.status_code
+        print(f"Status Code: {status_code}")
+        
+        if status_code == 200:
+            data = response.json()
+            print(f"✅ Sucesso!")
+            print(f"Total de análises: {data.get('resumo', {}).get('total_analises', 0)}")
+            print("\n📊 Resumo:")
+            print(json.dumps(data.get('resumo', {}), indent=2, ensure_ascii=False))
+            return True
         else:
-            print(f"❌ Erro de conexão: {e}")
+            print(f"❌ Erro {status_code}")
+            return False
+            
+    except httpx.ConnectError:
+        print(f"❌ Erro: Não foi possível conectar à API em {API_URL}")
+        return False
+    except httpx.HTTPError as e:
+        print(f"❌ Erro de conexão: {e}")
         return False
     except Exception as e:
         print(f"❌ Erro inesperado: {e}")
@@ -99,26 +99,25 @@ def test_health():
     url = f"{API_URL}/health"
     
     try:
-        req = urllib.request.Request(url)
-        with urllib.request.urlopen(req, timeout=5) as response:
-            status_code = response.getcode()
-            print(f"Status Code: {status_code}")
-            
-            if status_code == 200:
-                data = json.loads(response.read().decode('utf-8'))
-                print(f"✅ API está funcionando!")
-                print(f"Resposta: {json.dumps(data, indent=2)}")
-                return True
-            else:
-                print(f"❌ Erro {status_code}")
-                return False
-                
-    except urllib.error.URLError as e:
-        if "Connection refused" in str(e) or "Name or service not known" in str(e):
-            print(f"❌ Erro: Não foi possível conectar à API em {API_URL}")
-            print("   Certifique-se de que a API está rodando!")
+        response = _CLIENT.get(url, timeout=5)
+        status_code = response.status_code
+        print(f"Status Code: {status_code}")
+        
+        if status_code == 200:
+            data = response.json()
+            print(f"✅ API está funcionando!")
+            print(f"Resposta: {json.dumps(data, indent=2)}")
+            return True
         else:
-            print(f"❌ Erro de conexão: {e}")
+            print(f"❌ Erro {status_code}")
+            return False
+            
+    except httpx.ConnectError:
+        print(f"❌ Erro: Não foi possível conectar à API em {API_URL}")
+        print("   Certifique-se de que a API está rodando!")
+        return False
+    except httpx.HTTPError as e:
+        print(f"❌ Erro de conexão: {e}")
         return False
     except Exception as e:
         print(f"❌ Erro inesperado: {e}")